@@ -21,7 +21,7 @@ def ensure_dir(p: Path):
 @click.option("--out", required=True, help="Frontend output dir, e.g. ../frontend/src/wapp")
 @click.option("--overwrite-client", is_flag=True, help="Overwrite the generated client.ts if present")
 @click.option("--openapi-typescript", default="npx openapi-typescript", help="Command to run openapi-typescript (default: npx openapi-typescript)")
-@click.option("--emit-openapi-ts", is_flag=True, help="Emit openapi.ts instead of .ts (recommended)")
+@click.option("--emit-openapi-ts", is_flag=True, help="Pipe the spec to openapi-typescript and emit openapi.ts only (no openapi.json)")
 def command(app: str, out: str, overwrite_client: bool, openapi_typescript: str, emit_openapi_ts: bool):
     """Export OpenAPI JSON and TypeScript artifacts using the bundled exporter."""
     out_dir = Path(out).resolve()
@@ -1,14 +1,20 @@
 # wapp/core/asgi.py
 import inspect
+import json
+import operator
 import re
-from typing import Any, Dict, List, Optional, Tuple, Type
-
-from fastapi import FastAPI, Request, Path
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel as PydanticModel, create_model
-from sqlalchemy import Column
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+from weakref import WeakKeyDictionary
+
+from fastapi import APIRouter, Body, Depends, FastAPI, HTTPException, Path, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel as PydanticModel, ValidationError, create_model
+from sqlalchemy import Column, bindparam, event, select
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, load_only
 from starlette.middleware.cors import CORSMiddleware
 
 _PARAM_RE = re.compile(r"\{(?P<name>[a-zA-Z_]\w*)(?::(?P<type>int|str|float))?}")
@@ -30,15 +36,61 @@ def _parse_path_params(fastapi_path: str):
     return out
 
 
+def _tuple_getter(names: Tuple[str, ...]):
+    # operator.attrgetter returns a bare value (not a 1-tuple) for a single name
+    if not names:
+        return lambda obj: ()
+    if len(names) == 1:
+        name = names[0]
+        return lambda obj: (getattr(obj, name),)
+    return operator.attrgetter(*names)
+
 
 class BaseModel(DeclarativeBase):
-    ...
+    @classmethod
+    def _row_layout(cls) -> Tuple[Tuple[str, ...], Any]:
+        # (column names, getter by attribute key), resolved from the mapper on first use rather
+        # than at class creation so reflected, late-added and STI-subclass columns are included
+        attrs = cls.__mapper__.column_attrs
+        layout = (
+            tuple(p.columns[0].name for p in attrs),
+            _tuple_getter(tuple(p.key for p in attrs)),
+        )
+        cls._wapp_row_layout = layout
+        return layout
+
+    def as_dict(self) -> Dict[str, Any]:
+        # keyed by column name, like the generated Out schema
+        cls = type(self)
+        names, getter = cls.__dict__.get("_wapp_row_layout") or cls._row_layout()
+        return dict(zip(names, getter(self)))
 
 
 # ---------- DB bootstrap (async) ----------
 
-def make_sessionmaker(db_url: str) -> async_sessionmaker[AsyncSession]:
-    engine = create_async_engine(db_url, future=True, pool_pre_ping=True)
+def install_sqlite_pragmas(engine: Engine, pragmas: Sequence[str]) -> None:
+    # `engine` is a sync Engine (pass `async_engine.sync_engine` for async ones);
+    # no-op unless it is SQLite and there is something to apply
+    if not pragmas or engine.dialect.name != "sqlite":
+        return
+
+    # runs once per physical connection, i.e. once per pool slot
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        for pragma in pragmas:
+            cur.execute(f"PRAGMA {pragma}")
+        cur.close()
+
+def make_sessionmaker(
+    db_url: str,
+    *,
+    engine_options: Optional[Dict[str, Any]] = None,
+    sqlite_pragmas: Sequence[str] = (),
+) -> async_sessionmaker[AsyncSession]:
+    options = {"future": True, "pool_pre_ping": True, **(engine_options or {})}
+    engine = create_async_engine(db_url, **options)
+    install_sqlite_pragmas(engine.sync_engine, sqlite_pragmas)
     return async_sessionmaker(engine, expire_on_commit=False)
 
 # ---------- Minimal endpoint contract (class-based, FastAPI-ready) ----------
@@ -56,6 +108,8 @@ class EndpointMeta(PydanticModel):
     request_model: Optional[Type[PydanticModel]] = None
     response_model: Optional[Type[PydanticModel]] = None
     tags: List[str] = []
+    # False: hand the raw JSON body to handle(); request_model then only feeds the OpenAPI requestBody
+    validate_request: bool = True
 
 class WappEndpoint:
     Meta: EndpointMeta  # just a type hint for editors
@@ -69,14 +123,30 @@ _path_int   = re.compile(r"<int:([a-zA-Z_]\w*)>")
 _path_str   = re.compile(r"<string:([a-zA-Z_]\w*)>")
 _path_plain = re.compile(r"<([a-zA-Z_]\w*)>")
 
+_ROUTE_METHODS = frozenset({"GET", "POST", "PUT", "PATCH", "DELETE"})
+_BODY_METHODS = frozenset({"POST", "PUT", "PATCH"})
+
 def flask_to_fastapi_path(p: str) -> str:
     p = _path_int.sub(r"{\1:int}", p)
     p = _path_str.sub(r"{\1:str}", p)
     p = _path_plain.sub(r"{\1}", p)
     return p
 
+@lru_cache(maxsize=None)
+def _compile_pattern(pattern: str) -> Tuple[str, Tuple[Tuple[str, type], ...]]:
+    # Meta.pattern -> (FastAPI path, path param spec); parsed once per pattern
+    fpath = flask_to_fastapi_path(pattern)
+    return fpath, tuple(_parse_path_params(fpath))
+
+def _col_python_type(col: Column, default: type) -> type:
+    # TypeEngine.python_type raises NotImplementedError for custom types
+    try:
+        return col.type.python_type
+    except NotImplementedError:
+        return default
+
 def _col_is_autoincrement(col: Column) -> bool:
-    return bool(col.autoincrement or (col.primary_key and col.type.python_type in (int,)))
+    return bool(col.autoincrement or (col.primary_key and _col_python_type(col, object) in (int,)))
 
 def _pyd_name(model: PydanticModel) -> str:
     return f"{model.__name__}"
@@ -96,19 +166,19 @@ def build_pyd_from_sqla(
     """
     fields: Dict[str, Tuple[Any, Any]] = {}
     for col in sa_model.__table__.columns:  # type: ignore[attr-defined]
-        py_t = getattr(col.type, "python_type", str)  # fallback
+        py_t = _col_python_type(col, str)
         required = not col.nullable and col.default is None and col.server_default is None
 
         if mode == "out":
             default = ... if required and not _col_is_autoincrement(col) else None
-            fields[col.name] = (py_t, default if default is not None else None)
+            fields[col.name] = (py_t, default)
 
         elif mode == "create":
             if col.primary_key and _col_is_autoincrement(col):
                 continue  # let DB generate
             # require if needed
             default = ... if required and not col.primary_key else None
-            fields[col.name] = (py_t, default if default is not None else None)
+            fields[col.name] = (py_t, default)
 
         elif mode == "update":
             # all optional
@@ -118,9 +188,30 @@ def build_pyd_from_sqla(
     return create_model(model_name, **fields)  # type: ignore
 
 # ---------- Auto-CRUD router (async SQLAlchemy 2.x) ----------
-from fastapi import APIRouter, Depends, HTTPException, Body
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+
+_EMPTY_JSON_ARRAY = b"[]"
+
+_COMPONENT_REF = "#/components/schemas/{model}"
+
+def _request_body_openapi(model: Type[PydanticModel]) -> Dict[str, Any]:
+    # FastAPI's recipe for bodies read from the Request: describe them in openapi_extra.
+    # The schema itself is a component that make_app adds (_request_model_components), so nested
+    # models resolve against components.schemas instead of a dangling #/$defs pointer
+    return {
+        "requestBody": {
+            "content": {"application/json": {"schema": {"$ref": _COMPONENT_REF.format(model=model.__name__)}}},
+            "required": True,
+        }
+    }
+
+def _request_model_components(models: Sequence[Type[PydanticModel]]) -> Dict[str, Any]:
+    # components.schemas entries for request models and the nested models they reference
+    out: Dict[str, Any] = {}
+    for model in models:
+        schema = model.model_json_schema(ref_template=_COMPONENT_REF)
+        out.update(schema.pop("$defs", {}))
+        out[model.__name__] = schema
+    return out
 
 def _finalize_dyn_model(m):
     # Give Pydantic v2 a stable identity and ensure it’s built
@@ -129,28 +220,62 @@ def _finalize_dyn_model(m):
         m.model_rebuild()
     return m
 
-def make_crud_router(sa_model, *, session_dep, slug: str, group_tag: str) -> APIRouter:
+# weak keys: models built on the fly (e.g. in tests) don't outlive their last reference
+_CRUD_SCHEMAS: "WeakKeyDictionary[type, Tuple[Type[PydanticModel], Type[PydanticModel], Type[PydanticModel]]]" = WeakKeyDictionary()
+
+def _crud_schemas(sa_model) -> Tuple[Type[PydanticModel], Type[PydanticModel], Type[PydanticModel]]:
+    # generated once per model class and shared by every router/app built from it
+    cached = _CRUD_SCHEMAS.get(sa_model)
+    if cached is not None:
+        return cached
     Out    = _finalize_dyn_model(build_pyd_from_sqla(sa_model, mode="out"))
     Create = _finalize_dyn_model(build_pyd_from_sqla(sa_model, mode="create"))
     Update = _finalize_dyn_model(build_pyd_from_sqla(sa_model, mode="update"))
+    _CRUD_SCHEMAS[sa_model] = (Out, Create, Update)
+    return Out, Create, Update
 
-    r = APIRouter(prefix=f"/{slug}", tags=[group_tag])
+def make_crud_router(sa_model, *, session_dep, slug: str, group_tag: str) -> APIRouter:
+    r = APIRouter()
+    _add_crud_routes(r, sa_model, session_dep=session_dep, prefix=f"/{slug}", group_tag=group_tag)
+    return r
+
+def _add_crud_routes(router: APIRouter, sa_model, *, session_dep, prefix: str, group_tag: Optional[str]) -> None:
+    # registers list/get/create/update/delete for `sa_model` directly on `router` under `prefix`
+    Out, Create, Update = _crud_schemas(sa_model)
+    col_attrs = sa_model.__mapper__.column_attrs
+    # payload keys are column names; attribute keys may differ (mapped_column("db_name", ...))
+    attr_for_column = {p.columns[0].name: p.key for p in col_attrs}
+    # exactly the mapped columns as_dict() reads (deferred ones included), one SELECT
+    load_cols = load_only(*(getattr(sa_model, p.key) for p in col_attrs))
+    pk_col = sa_model.__mapper__.primary_key[0]
+    # resolve the PK type once so FastAPI casts `id` before session.get()
+    pk_type = _col_python_type(pk_col, int)
+    id_path = "/{id:int}" if pk_type is int else "/{id}"
+    # statements are immutable: build them here, per request only bind values / page bounds
+    list_stmt = select(sa_model).options(load_cols)
+    get_stmt = list_stmt.where(pk_col == bindparam("pk"))
+
+    tags = [group_tag]
+    item_path = prefix + id_path
 
     # --- list ---
     async def list_handler(page: int = 1, page_size: int = 50,
                            session: AsyncSession = Depends(session_dep)):
-        stmt = select(sa_model).offset((page - 1) * page_size).limit(page_size)
+        stmt = list_stmt.offset((page - 1) * page_size).limit(page_size)
         rows = (await session.execute(stmt)).scalars().all()
-        return [Out.model_validate(obj, from_attributes=True) for obj in rows]
-    r.get("/", response_model=list[Out])(list_handler)  # Python 3.9+: use List[Out]
+        if not rows:
+            # past the last page: skip response-model validation + encoding
+            return Response(_EMPTY_JSON_ARRAY, media_type="application/json")
+        return [obj.as_dict() for obj in rows]
+    router.get(prefix + "/", response_model=list[Out], tags=tags)(list_handler)  # Python 3.9+: use List[Out]
 
     # --- get_one ---
-    async def get_handler(id: int, session: AsyncSession = Depends(session_dep)):
-        obj = await session.get(sa_model, id)
+    async def get_handler(id: pk_type, session: AsyncSession = Depends(session_dep)):
+        obj = (await session.execute(get_stmt, {"pk": id})).scalar_one_or_none()
         if not obj:
             raise HTTPException(404, "Not found")
-        return Out.model_validate(obj, from_attributes=True)
-    r.get("/{id:int}", response_model=Out)(get_handler)
+        return obj.as_dict()
+    router.get(item_path, response_model=Out, tags=tags)(get_handler)
 
     # --- create ---
     async def create_handler(payload: Create = Body(...),
@@ -159,32 +284,33 @@ def make_crud_router(sa_model, *, session_dep, slug: str, group_tag: str) -> API
         session.add(obj)
         await session.commit()
         await session.refresh(obj)
-        return Out.model_validate(obj, from_attributes=True)
-    r.post("/", response_model=Out, status_code=201)(create_handler)
+        return obj.as_dict()
+    router.post(prefix + "/", response_model=Out, status_code=201, tags=tags)(create_handler)
 
     # --- update ---
-    async def update_handler(id: int, payload: Update = Body(...),
+    async def update_handler(id: pk_type, payload: Update = Body(...),
                              session: AsyncSession = Depends(session_dep)):
         obj = await session.get(sa_model, id)
         if not obj:
             raise HTTPException(404, "Not found")
-        for k, v in payload.model_dump(exclude_unset=True).items():
-            setattr(obj, k, v)
+        data = payload.model_dump(exclude_unset=True)
+        # only touch plain columns; no flush (or lazy load) while assigning
+        with session.no_autoflush:
+            for k in attr_for_column.keys() & data.keys():
+                setattr(obj, attr_for_column[k], data[k])
         await session.commit()
         await session.refresh(obj)
-        return Out.model_validate(obj, from_attributes=True)
-    r.put("/{id:int}", response_model=Out)(update_handler)
+        return obj.as_dict()
+    router.put(item_path, response_model=Out, tags=tags)(update_handler)
 
     # --- delete ---
-    async def delete_handler(id: int, session: AsyncSession = Depends(session_dep)):
+    async def delete_handler(id: pk_type, session: AsyncSession = Depends(session_dep)):
         obj = await session.get(sa_model, id)
         if obj:
             await session.delete(obj)
             await session.commit()
-        return {}
-    r.delete("/{id:int}", status_code=204)(delete_handler)
-
-    return r
+        return Response(status_code=204)
+    router.delete(item_path, status_code=204, tags=tags)(delete_handler)
 
 
 # ---------- Wapp (ASGI edition) ----------
@@ -205,93 +331,150 @@ class Wapp:
     class Endpoints: ...
     class Wapps: ...
 
-    @classmethod
-    def get_models(cls) -> List[Tuple[str, Type[PydanticModel]]]:
+    _wapp_models: Tuple[Tuple[str, Type[BaseModel]], ...] = ()
+    _wapp_crud: Tuple[Tuple[str, Type[BaseModel]], ...] = ()
+    _wapp_endpoints: Tuple[Tuple[str, Type[WappEndpoint]], ...] = ()
+    # (endpoint class, Meta, METHOD, FastAPI path, path param spec) per routable endpoint
+    _wapp_routes: Tuple[Tuple[Type[WappEndpoint], EndpointMeta, str, str, Tuple[Tuple[str, type], ...]], ...] = ()
+    _wapp_nested: Tuple[Tuple[str, Type["Wapp"]], ...] = ()
+    # (attr name -> URL segment, nested wapp, humanized OpenAPI tag)
+    _wapp_children: Tuple[Tuple[str, Type["Wapp"], str], ...] = ()
+
+    def __init_subclass__(cls, **kw: Any) -> None:
+        super().__init_subclass__(**kw)
+        # the inner containers are fixed once the class body has run: scan them here, once
         models = getattr(cls, "Models", None)
-        if not models:
-            return []
-        out = []
-        for name, obj in models.__dict__.items():
-            if isinstance(obj, type) and issubclass(obj, BaseModel) and name[0] != "_":
-                out.append((name, obj))
-        return out
+        cls._wapp_models = tuple(
+            (name, obj) for name, obj in models.__dict__.items()
+            if isinstance(obj, type) and issubclass(obj, BaseModel) and name[0] != "_"
+        ) if models else ()
+
+        eps = getattr(cls, "Endpoints", None)
+        eps_items = tuple(eps.__dict__.items()) if eps else ()
+        cls._wapp_endpoints = tuple(
+            (name, obj) for name, obj in eps_items
+            if isinstance(obj, type) and issubclass(obj, WappEndpoint)
+        )
+        routes = []
+        for _, ep_cls in cls._wapp_endpoints:
+            meta = getattr(ep_cls, "Meta", None)
+            if meta and meta.method and meta.pattern:
+                routes.append((ep_cls, meta, meta.method.upper(), *_compile_pattern(meta.pattern)))
+        cls._wapp_routes = tuple(routes)
+        # `_<model_name> = True | {...}` flags that map onto a declared model
+        model_map = dict(cls._wapp_models)
+        cls._wapp_crud = tuple(
+            (name[1:], model_map[name[1:]]) for name, val in eps_items
+            if name[0] == "_" and name[1:] in model_map and (val is True or isinstance(val, dict))
+        )
 
-    @classmethod
-    def get_wapps(cls) -> List[Tuple[str, Type["Wapp"]]]:
         wapps = getattr(cls, "Wapps", None)
-        if not wapps:
-            return []
-        out = []
-        for name, obj in wapps.__dict__.items():
-            if isinstance(obj, type) and issubclass(obj, Wapp) and obj is not cls:
-                out.append((name, obj))
-        return out
+        cls._wapp_nested = tuple(
+            (name, obj) for name, obj in wapps.__dict__.items()
+            if isinstance(obj, type) and issubclass(obj, Wapp) and obj is not cls
+        ) if wapps else ()
+        cls._wapp_children = tuple((name, obj, _humanize_tag(name)) for name, obj in cls._wapp_nested)
 
     @classmethod
-    def get_endpoints(cls) -> List[Tuple[str, Type[WappEndpoint]]]:
-        eps = getattr(cls, "Endpoints", None)
-        if not eps:
-            return []
-        out = []
-        for name, obj in eps.__dict__.items():
-            if isinstance(obj, type) and issubclass(obj, WappEndpoint):
-                out.append((name, obj))
-        return out
+    def get_models(cls) -> Tuple[Tuple[str, Type[BaseModel]], ...]:
+        return cls._wapp_models
+
+    @classmethod
+    def get_wapps(cls) -> Tuple[Tuple[str, Type["Wapp"]], ...]:
+        return cls._wapp_nested
+
+    @classmethod
+    def get_endpoints(cls) -> Tuple[Tuple[str, Type[WappEndpoint]], ...]:
+        return cls._wapp_endpoints
+
+    @classmethod
+    def _request_models(cls) -> Tuple[Type[PydanticModel], ...]:
+        # request models documented as a requestBody, across this wapp and its nested wapps
+        found = [
+            meta.request_model for _, meta, method, _, _ in cls._wapp_routes
+            if meta.request_model and method in _BODY_METHODS
+        ]
+        for _, wcls, _ in cls._wapp_children:
+            found.extend(wcls._request_models())
+        return tuple(dict.fromkeys(found))
 
     @classmethod
     def build_router(cls, *, session_dep, prefix: str = "", group_tag: str = None) -> APIRouter:
         # make the router carry the group tag; we’ll still set per-route tags explicitly
         router = APIRouter(prefix=prefix)
+        cls._register_routes(router, session_dep=session_dep, prefix="", group_tag=group_tag)
+        return router
+
+    @classmethod
+    def _register_routes(cls, router: APIRouter, *, session_dep, prefix: str, group_tag: Optional[str]) -> None:
+        # adds this wapp's routes (and its nested wapps', recursively) straight onto `router`
+        # under `prefix`, so each route is built once instead of re-copied by include_router
+        # at every nesting level
+        add_route = router.add_api_route
 
         # 1) Auto CRUD (use the wapp's group_tag, not model names)
-        model_map = {n: m for n, m in cls.get_models()}
-        eps_container = getattr(cls, "Endpoints", None)
-        if eps_container:
-            for attr_name, val in eps_container.__dict__.items():
-                if not attr_name.startswith("_"):
-                    continue
-                model_name = attr_name[1:]
-                model = model_map.get(model_name)
-                if not model:
-                    continue
-                meta = getattr(model, "Meta", None)
-                if not meta or not getattr(meta, "slug", None):
-                    raise ValueError(f"Model '{model_name}' missing Meta.slug")
-                slug = meta.slug
-
-                if val is True or isinstance(val, dict):
-                    crud_router = make_crud_router(
-                        model,
-                        session_dep=session_dep,
-                        slug=slug,
-                        group_tag=group_tag,  # <- enforce single tag
-                    )
-                    router.include_router(crud_router)
+        for model_name, model in cls._wapp_crud:
+            slug = getattr(getattr(model, "Meta", None), "slug", None)
+            if not slug:
+                raise ValueError(f"Model '{model_name}' missing Meta.slug")
+
+            _add_crud_routes(
+                router,
+                model,
+                session_dep=session_dep,
+                prefix=f"{prefix}/{slug}",
+                group_tag=group_tag,  # <- enforce single tag
+            )
 
         # 2) Custom endpoints (force this wapp’s group_tag)
-        for _, ep_cls in cls.get_endpoints():
-            meta: EndpointMeta = getattr(ep_cls, "Meta", None)
-            if not meta or not meta.method or not meta.pattern:
-                continue
-
-            fpath = flask_to_fastapi_path(meta.pattern)
-            method = meta.method.upper()
-            path_params_spec = _parse_path_params(fpath)
+        for ep_cls, meta, method, fpath, path_params_spec in cls._wapp_routes:
+            if method not in _ROUTE_METHODS:
+                raise ValueError(f"Unsupported method: {method}")
 
             # create the handler (real function still accepts **path_kwargs)
             def _create_handler(ep_cls=ep_cls, meta=meta, path_params_spec=path_params_spec):
+                # resolve Meta once per route; the route only ever sees `method`
+                reads_body = method in _BODY_METHODS
+                validate = meta.request_model.model_validate if meta.request_model and meta.validate_request else None
+
                 async def handler(
                         request: Request,
                         session: AsyncSession = Depends(session_dep),
                         **path_kwargs,
                 ):
                     body = None
-                    if request.method in ("POST", "PUT", "PATCH"):
-                        try:
-                            raw = await request.json()
-                        except Exception:
-                            raw = None
-                        body = meta.request_model.model_validate(raw) if meta.request_model and raw is not None else raw
+                    if reads_body:
+                        raw_body = await request.body()
+                        if validate is None:
+                            # raw mode: empty body -> None without a decode attempt; malformed JSON -> None too
+                            try:
+                                body = json.loads(raw_body) if raw_body else None
+                            except ValueError:  # JSONDecodeError / UnicodeDecodeError
+                                body = None
+                        else:
+                            # client errors: answer 422 with the same entries as FastAPI's own Body params
+                            if not raw_body:
+                                raise RequestValidationError(
+                                    [{"type": "missing", "loc": ("body",), "msg": "Field required", "input": None}]
+                                )
+                            try:
+                                raw = json.loads(raw_body)
+                            except ValueError as e:  # JSONDecodeError / UnicodeDecodeError
+                                raise RequestValidationError(
+                                    [{
+                                        "type": "json_invalid",
+                                        "loc": ("body", getattr(e, "pos", 0)),
+                                        "msg": "JSON decode error",
+                                        "input": {},
+                                        "ctx": {"error": getattr(e, "msg", str(e))},
+                                    }],
+                                    body=raw_body,
+                                ) from None
+                            try:
+                                body = validate(raw)
+                            except ValidationError as ve:
+                                errors = [{**e, "loc": ("body", *e["loc"])} for e in ve.errors(include_url=False)]
+                                raise RequestValidationError(errors, body=raw) from None
 
                     inst = ep_cls()
                     result = await inst.handle(request, dict(request.query_params), path_kwargs, body, session)
@@ -326,38 +509,30 @@ class Wapp:
 
             handler = _create_handler()
 
-            kwargs = dict(
-                path=fpath,
+            add_route(
+                prefix + fpath,
+                handler,
+                methods=[method],
                 name=meta.name or ep_cls.__name__,
                 summary=meta.summary,
                 description=meta.description,
                 response_model=meta.response_model,
                 tags=[group_tag],
+                # the handler reads the body itself, so FastAPI can't infer it: document it explicitly
+                openapi_extra=(
+                    _request_body_openapi(meta.request_model)
+                    if meta.request_model and method in _BODY_METHODS else None
+                ),
             )
-            if method == "GET":
-                router.get(**kwargs)(handler)
-            elif method == "POST":
-                router.post(**kwargs)(handler)
-            elif method == "PUT":
-                router.put(**kwargs)(handler)
-            elif method == "PATCH":
-                router.patch(**kwargs)(handler)
-            elif method == "DELETE":
-                router.delete(**kwargs)(handler)
-            else:
-                raise ValueError(f"Unsupported method: {method}")
 
-        # 3) Nested wapps: derive child tag from attribute name
-        for wname, wcls in cls.get_wapps():
-            child_tag = _humanize_tag(wname)
-            child = wcls.build_router(
+        # 3) Nested wapps: child tag was derived from the attribute name at class creation
+        for wname, wcls, child_tag in cls._wapp_children:
+            wcls._register_routes(
+                router,
                 session_dep=session_dep,
-                prefix=f"/{wname}",
+                prefix=f"{prefix}/{wname}",
                 group_tag=child_tag,
             )
-            router.include_router(child)
-
-        return router
 
 # ---------- Factory for an app with a root Wapp ----------
 
@@ -368,13 +543,32 @@ def get_session_dep(session_maker: async_sessionmaker[AsyncSession]):
             yield s
     return _dep
 
-def make_app(root_wapp: Type[Wapp], *, db_url: str, title: str = "Wapp API", lifespan=None) -> FastAPI:
-    session_maker = make_sessionmaker(db_url)
+def make_app(
+    root_wapp: Type[Wapp],
+    *,
+    db_url: str,
+    title: str = "Wapp API",
+    lifespan=None,
+    engine_options: Optional[Dict[str, Any]] = None,
+    sqlite_pragmas: Sequence[str] = (),
+) -> FastAPI:
+    session_maker = make_sessionmaker(db_url, engine_options=engine_options, sqlite_pragmas=sqlite_pragmas)
 
     session_dep = get_session_dep(session_maker)
 
     app = FastAPI(title=title, lifespan=lifespan)
-    app.include_router(root_wapp.build_router(session_dep=session_dep))
+    root_wapp._register_routes(app.router, session_dep=session_dep, prefix="", group_tag=None)
+
+    request_models = root_wapp._request_models()
+    if request_models:
+        # FastAPI only emits components for the params it parses; add the request-body ones
+        def openapi() -> Dict[str, Any]:
+            if app.openapi_schema is None:
+                schemas = FastAPI.openapi(app).setdefault("components", {}).setdefault("schemas", {})
+                for name, schema in _request_model_components(request_models).items():
+                    schemas.setdefault(name, schema)
+            return app.openapi_schema
+        app.openapi = openapi
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["http://localhost:5173"],
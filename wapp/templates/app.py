@@ -3,11 +3,18 @@
 
 from automigrate import lifespan_with_subprocess
 from users_demo import UsersWapp
-from settings import DB_URL_ASYNC
+from settings import DB_URL_ASYNC, DB_ENGINE_OPTIONS, DB_SQLITE_PRAGMAS
 from wapp.core.asgi import make_app
 
 # Create the app directly from the UsersWapp exported by users_demo
-app = make_app(UsersWapp, db_url=DB_URL_ASYNC, title="Wapp Users Demo API", lifespan=lifespan_with_subprocess)
+app = make_app(
+    UsersWapp,
+    db_url=DB_URL_ASYNC,
+    title="Wapp Users Demo API",
+    lifespan=lifespan_with_subprocess,
+    engine_options=DB_ENGINE_OPTIONS,
+    sqlite_pragmas=DB_SQLITE_PRAGMAS,
+)
 
 # Optional: simple health endpoint
 
@@ -14,7 +14,7 @@ from sqlalchemy.ext.asyncio import create_async_engine
 # Import your metadata and optional sync URL from the project's settings module
 # settings.py should export DB_URL_SYNC (sync URL string) and models should inherit from wapp.core.asgi.BaseModel
 import settings
-from wapp.core.asgi import BaseModel
+from wapp.core.asgi import BaseModel, install_sqlite_pragmas
 
 # this is the Alembic Config object, which provides access to values within the .ini file
 config = context.config
@@ -90,6 +90,8 @@ def run_migrations_online() -> None:
             poolclass=pool.NullPool,
             future=True,
         )
+        # same per-connection PRAGMAs as the app engine (settings.DB_SQLITE_PRAGMAS)
+        install_sqlite_pragmas(connectable, getattr(settings, "DB_SQLITE_PRAGMAS", ()))
         with connectable.connect() as connection:  # type: Connection
             context.configure(
                 connection=connection,
@@ -8,6 +8,29 @@ DB_URL_ASYNC = getenv("DB_URL_ASYNC", "sqlite+aiosqlite:///./dev.db")
 # Sync DB URL used by Alembic (default: local sqlite file for autogenerate)
 DB_URL_SYNC = getenv("DB_URL_SYNC", "sqlite:///./dev.db")
 
+# Async engine options passed to create_async_engine by make_app: keep a warm pool
+# of connections instead of opening one on demand. (Drop pool_size/max_overflow for
+# sqlite ":memory:" URLs, which use a single static connection.)
+DB_ENGINE_OPTIONS = {
+    "pool_size": 10,
+    "max_overflow": 0,
+    "pool_pre_ping": False,
+}
+
+# PRAGMAs applied once per new SQLite connection (ignored for other databases), both by the
+# app engine and by Alembic's engine in migrations/env.py. WAL lets the two share ./dev.db
+# without blocking readers, and synchronous=NORMAL drops the fsync on every commit.
+DB_SQLITE_PRAGMAS = (
+    "journal_mode=WAL",
+    "synchronous=NORMAL",
+    "cache_size=-65536",
+    "temp_store=MEMORY",
+    "mmap_size=134217728",
+)
+
 # NOTE: For production, set DB_URL_ASYNC to a proper async driver (eg. postgresql+asyncpg://...)
 # and DB_URL_SYNC to the corresponding sync driver (eg. postgresql+psycopg://...).
+# DB_ENGINE_OPTIONS then sizes SQLAlchemy's pool around asyncpg connections. The asyncpg
+# dialect prepares each distinct statement once per pooled connection and reuses it; size
+# that cache with "?prepared_statement_cache_size=N" on DB_URL_ASYNC (default 100).
 
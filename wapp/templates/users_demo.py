@@ -3,11 +3,15 @@
 
 from __future__ import annotations
 
+import re
 from typing import Any, Dict
 from datetime import datetime, timezone
 
+from fastapi import HTTPException
 from pydantic import BaseModel, EmailStr
-from sqlalchemy import select, String, Integer, Boolean, DateTime
+from sqlalchemy import exists, select, String, Integer, Boolean, DateTime
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -25,6 +29,12 @@ class User(DeclarativeBaseModel):
     class Meta:
         slug = "users"
 
+# Loose address shape check for endpoints that opt out of pydantic validation
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+# Dialects with INSERT ... ON CONFLICT DO NOTHING (RETURNING is checked per bind)
+_CONFLICT_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
 # --- Request/response models for auth endpoints ---
 class CheckEmailReq(BaseModel):
     email: EmailStr
@@ -41,20 +51,28 @@ class SignupRes(BaseModel):
 
 # --- Custom endpoints as WappEndpoint subclasses ---
 class CheckEmailEndpoint(WappEndpoint):
+    # read-only lookup: skip pydantic and do a cheap shape check on the raw body instead;
+    # request_model still describes the body in the OpenAPI schema
     Meta = EndpointMeta(
         method="POST",
         pattern="/auth/check_email",
         name="check_email",
         request_model=CheckEmailReq,
         response_model=CheckEmailRes,
+        validate_request=False,
     )
 
     async def handle(self, request, query: Dict[str, Any], path: Dict[str, Any], body: Any, session: AsyncSession):
-        email = getattr(body, "email", None) if body is not None else None
-        stmt = select(User).where(User.email == email)
-        res = await session.execute(stmt)
-        user = res.scalars().first()
-        return CheckEmailRes(exists=bool(user))
+        email = body.get("email") if isinstance(body, dict) else None
+        if not isinstance(email, str) or len(email) > 254 or not _EMAIL_RE.match(email):
+            # same error shape as FastAPI's own request validation
+            raise HTTPException(status_code=422, detail=[
+                {"loc": ["body", "email"], "msg": "value is not a valid email address", "type": "value_error"},
+            ])
+        # a single boolean column: no User row is loaded into the session
+        res = await session.execute(select(exists().where(User.email == email)))
+        # plain dict: FastAPI serialises it through response_model straight to JSON bytes
+        return {"exists": bool(res.scalar())}
 
 class SignupEndpoint(WappEndpoint):
     Meta = EndpointMeta(
@@ -66,18 +84,32 @@ class SignupEndpoint(WappEndpoint):
     )
 
     async def handle(self, request, query: Dict[str, Any], path: Dict[str, Any], body: Any, session: AsyncSession):
-        email = getattr(body, "email", None) if body is not None else None
-        stmt = select(User).where(User.email == email)
-        res = await session.execute(stmt)
-        if res.scalars().first():
-            from fastapi import HTTPException
+        email = getattr(body, "email", None)
+        dialect = session.get_bind().dialect
+        # RETURNING needs the backend too (e.g. SQLite < 3.35 has ON CONFLICT but no RETURNING)
+        insert = _CONFLICT_INSERTS.get(dialect.name) if dialect.insert_returning else None
+        if insert is None:
+            # other backends: check, insert, then read the generated id back
+            res = await session.execute(select(User.id).where(User.email == email))
+            if res.first():
+                raise HTTPException(status_code=400, detail="Email already registered")
+            user = User(email=email)
+            session.add(user)
+            await session.commit()
+            return {"id": user.id, "email": user.email}
+
+        # one round trip: the unique email decides between inserted row and conflict
+        stmt = (
+            insert(User)
+            .values(email=email)
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User.id, User.email)
+        )
+        row = (await session.execute(stmt)).first()
+        if row is None:
             raise HTTPException(status_code=400, detail="Email already registered")
-        user = User(email=email)
-        session.add(user)
         await session.commit()
-        await session.refresh(user)
-        from pydantic import EmailStr as _EmailStr
-        return SignupRes(id=user.id, email=_EmailStr(user.email))
+        return {"id": row.id, "email": row.email}
 
 # --- Wapp definition ---
 class UsersWapp(Wapp):
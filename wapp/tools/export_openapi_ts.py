@@ -4,29 +4,48 @@ from __future__ import annotations
 import argparse
 import importlib
 import inspect
+import io
 import json
+import os
 import pathlib
 import re
+import shlex
+import shutil
+import string
 import subprocess
-from typing import Any, Dict, List, Tuple
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple
 
-# ----------------- helpers -----------------
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib encoder
+    orjson = None
 
-def pascal(s: str) -> str:
-    # turn snake/kebab/space into PascalCase
-    return "".join(part.capitalize() for part in re.split(r"[_\W]+", s) if part)
+# ----------------- helpers -----------------
 
+_SPLIT_WORD = re.compile(r"[_\W]+")
+_CAMEL_BOUNDARY = re.compile(r"([a-z0-9])([A-Z])")
+_UNDERSCORES = re.compile(r"_+")
+_NON_WORD = re.compile(r"[^\w]+")
+_HAS_INTERNAL_CAPS = re.compile(r"[a-z][A-Z]")
+_HAS_UPPER = re.compile(r"[A-Z]")
+_REF_SUFFIX = re.compile(r"^(.+?)_(Out|Create|Update)$")
+# every ASCII char outside [A-Za-z0-9] (i.e. what [_\W] matches) -> space
+_ASCII_SEPARATORS = {c: " " for c in range(128) if not chr(c).isalnum()}
+
+@lru_cache(maxsize=4096)
 def _score_name_quality(s: str) -> int:
     # Prefer names with separators or internal caps (clear word boundaries)
     score = 0
     if any(ch in s for ch in ("_", "-", " ")): score += 2
-    if re.search(r"[a-z][A-Z]", s): score += 2  # camel/internal caps
+    if _HAS_INTERNAL_CAPS.search(s): score += 2  # camel/internal caps
     if s and s[0].isupper(): score += 1
     # Penalize single-capitalized lumps like "Someentity"
-    if s.lower() == s or (s[0:1].isupper() and s[1:].islower() and not re.search(r"[a-z][A-Z]", s)):
+    if s.lower() == s or (s[0:1].isupper() and s[1:].islower() and not _HAS_INTERNAL_CAPS.search(s)):
         score -= 1
     return score
 
+@lru_cache(maxsize=4096)
 def pick_model_base(schema_base: str | None, resource_seg: str) -> str:
     """
     Choose the better 'base' name to PascalCase:
@@ -61,22 +80,43 @@ def write_text(path: pathlib.Path, text: str):
     ensure_dir(path.parent)
     path.write_text(text, encoding="utf-8")
 
+def dump_json(obj: Any) -> bytes:
+    # pretty-printed UTF-8 JSON; orjson when available, same layout either way
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+def write_bytes(path: pathlib.Path, data: bytes):
+    ensure_dir(path.parent)
+    path.write_bytes(data)
+
+def _words(s: str) -> List[str]:
+    # same tokens as _SPLIT_WORD.split(); ASCII input goes through a C-level table instead
+    if s.isascii():
+        return s.translate(_ASCII_SEPARATORS).split()
+    return [p for p in _SPLIT_WORD.split(s) if p]
+
+@lru_cache(maxsize=4096)
 def snake(s: str) -> str:
-    s = re.sub(r"[^\w]+", "_", s)
-    s = re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", s)
-    s = re.sub(r"_+", "_", s).strip("_")
+    if s.isascii():
+        s = _CAMEL_BOUNDARY.sub(r"\1 \2", s.translate(_ASCII_SEPARATORS))
+        return "_".join(s.split()).lower()
+    s = _NON_WORD.sub("_", s)
+    s = _CAMEL_BOUNDARY.sub(r"\1_\2", s)
+    s = _UNDERSCORES.sub("_", s).strip("_")
     return s.lower()
 
+@lru_cache(maxsize=4096)
 def pascal(s: str) -> str:
     if not s:
         return s
     # If it has separators, do true PascalCase
-    parts = [p for p in re.split(r"[_\W]+", s) if p]
+    parts = _words(s)
     if len(parts) > 1:
         return "".join(p[:1].upper() + p[1:].lower() for p in parts)
     # Single token:
     # If it already contains internal capitals (CamelCase), keep them.
-    if re.search(r"[A-Z]", s[1:]):
+    if _HAS_UPPER.search(s, 1):
         return s[0].upper() + s[1:]  # preserve internal caps
     # Else, standard capitalize
     return s.capitalize()
@@ -84,12 +124,20 @@ def pascal(s: str) -> str:
 def path_segments(p: str) -> List[str]:
     return [seg for seg in p.split("/") if seg]
 
+def last_literal_segment(p: str) -> str | None:
+    segs = path_segments(p)
+    if not segs: return None
+    last = segs[-1]
+    return last if "{" not in last else None
+
 def is_success(code: str) -> bool:
     return code == "200" or code == "201" or (len(code) == 3 and code.startswith("2"))
 
 # ----------------- scan openapi once -----------------
 
 class Op:
+    __slots__ = ("path", "method", "op")
+
     def __init__(self, path: str, method: str, op: Dict[str, Any]):
         self.path = path
         self.method = method.upper()
@@ -104,13 +152,17 @@ def scan_ops(spec: Dict[str, Any]) -> List[Op]:
                 ops.append(Op(p, mu, op))
     return ops
 
-def find_crud_bases(paths: Dict[str, Any]) -> List[Tuple[str,str]]:
+class CrudSpec(NamedTuple):
+    """Everything the generators need about one auto-CRUD resource, resolved once."""
+    base: str                  # list/create path, e.g. "/shop/some_entity/"
+    base_id: str               # item path, e.g. "/shop/some_entity/{id}"
+    namespace: List[str]       # literal segments above the resource, e.g. ["shop"]
+    resource: str              # last path segment, e.g. "some_entity"
+    schema_base: str | None    # model name behind the list response $ref, e.g. "Someentity"
+    model_base: str            # PascalCase name for the TS aliases, e.g. "SomeEntity"
+
+def build_crud_specs(paths: Dict[str, Any]) -> List[CrudSpec]:
     trailing_slash_bases = { p for p in paths.keys() if p.endswith("/") }
-    def last_literal_segment(p: str) -> str | None:
-        segs = path_segments(p)
-        if not segs: return None
-        last = segs[-1]
-        return last if "{" not in last else None
     crud = []
     for p in trailing_slash_bases:
         seg = last_literal_segment(p)
@@ -128,9 +180,38 @@ def find_crud_bases(paths: Dict[str, Any]) -> List[Tuple[str,str]]:
             if path_key not in paths or meth.lower() not in paths[path_key]:
                 ok = False; break
         if ok:
-            crud.append((p, p_id))
+            segs = path_segments(p)
+            list_res = ((paths[p]["get"].get("responses") or {}).get("200") or {})
+            schema_base = model_base_from_schema(
+                ((list_res.get("content") or {}).get("application/json") or {}).get("schema"))
+            crud.append(CrudSpec(
+                base=p,
+                base_id=p_id,
+                namespace=segs[:-1],
+                resource=seg,
+                schema_base=schema_base,
+                model_base=pick_model_base(schema_base, seg),
+            ))
     return crud
 
+class SpecIndex:
+    """Per-spec lookups shared by the facade and models builders, built once."""
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.paths: Dict[str, Any] = spec.get("paths") or {}
+        self.ops = scan_ops(spec)
+        self.crud_specs = build_crud_specs(self.paths)
+        self.crud_prefixes = frozenset(c.base for c in self.crud_specs)
+
+    def is_crud_path(self, p: str) -> bool:
+        # CRUD bases all end with "/", so only this path's own "/"-prefixes can match
+        i = p.find("/")
+        while i != -1:
+            if p[:i + 1] in self.crud_prefixes:
+                return True
+            i = p.find("/", i + 1)
+        return False
+
 def first_success_code(op: Dict[str, Any]) -> str | None:
     for code in (op.get("responses") or {}).keys():
         if is_success(code):
@@ -144,56 +225,48 @@ def model_base_from_schema(sch: Any) -> str | None:
     ref = sch.get("$ref")
     if isinstance(ref, str) and ref.startswith("#/components/schemas/"):
         title = ref.split("/")[-1]
-        m = re.match(r"^(.+?)_(Out|Create|Update)$", title)
+        m = _REF_SUFFIX.match(title)
         return m.group(1) if m else title
     if sch.get("type") == "array" and isinstance(sch.get("items"), dict):
         return model_base_from_schema(sch["items"])
     return None
 
-def build_facade(openapi: Dict[str, Any]) -> str:
-    paths: Dict[str, Any] = openapi.get("paths", {})  # type: ignore
-    ops = []
-    for p, methods in paths.items():
-        for m, op in methods.items():
-            m_up = m.upper()
-            if m_up not in ("GET","POST","PUT","PATCH","DELETE"): continue
-            params = { "path": [], "query": [] }
-            for prm in op.get("parameters", []):
-                where = prm.get("in")
-                if where in ("path","query"):
-                    params[where].append(prm)
-            rb = op.get("requestBody", {})
-            body_schema = None
-            if isinstance(rb, dict):
-                content = rb.get("content") or {}
-                js = content.get("application/json")
-                if js and isinstance(js, dict):
-                    body_schema = js.get("schema")
-            resp_schema = None
-            for code, resp in op.get("responses", {}).items():
-                if not is_success(code):
-                    continue
-                content = (resp or {}).get("content") or {}
-                js = content.get("application/json")
-                if js and isinstance(js, dict):
-                    resp_schema = js.get("schema")
-                    break
-                if code == "204":
-                    resp_schema = None
-                    break
-            ops.append({
-                "path": p, "method": m_up, "op": op,
-                "params": params, "body_schema": body_schema, "resp_schema": resp_schema
-            })
-
-    def last_literal_segment(p: str) -> str | None:
-        segs = path_segments(p)
-        if not segs: return None
-        last = segs[-1]
-        return last if "{" not in last else None
+# constant scaffolding of the facade nodes, filled in per node by emit_node
+
+_CRUD_TMPL = string.Template(
+    "${prop_indent}${key}: {\n"
+    "${prop_indent}  list: (query?: { page?: number; page_size?: number }) => client.GET('${base}/', { params: { query } }),\n"
+    "${prop_indent}  get: (id: number) => client.GET('${base}/{id}', { params: { path: { id } } }),\n"
+    "${prop_indent}  create: (body: paths['${base}/']['post']['requestBody']['content']['application/json']) => client.POST('${base}/', { body }),\n"
+    "${prop_indent}  update: (id: number, body: paths['${base}/{id}']['put']['requestBody']['content']['application/json']) => client.PUT('${base}/{id}', { params: { path: { id } }, body }),\n"
+    "${prop_indent}  delete: (id: number) => client.DELETE('${base}/{id}', { params: { path: { id } } }),\n"
+    "${prop_indent}}"
+)
+
+_ENDPOINT_TMPL = string.Template("${prop_indent}${key}: (${sig}) => client.${method}('${path}', { ${call_obj} })")
 
-    crud_bases = find_crud_bases(paths)
-    crud_set = { base for base,_ in crud_bases }
+def build_facade(index: SpecIndex) -> str:
+    ops = []
+    for o in index.ops:
+        if index.is_crud_path(o.path):
+            continue
+        op = o.op
+        params = { "path": [], "query": [] }
+        for prm in op.get("parameters", []):
+            where = prm.get("in")
+            if where in ("path","query"):
+                params[where].append(prm)
+        rb = op.get("requestBody", {})
+        body_schema = None
+        if isinstance(rb, dict):
+            content = rb.get("content") or {}
+            js = content.get("application/json")
+            if js and isinstance(js, dict):
+                body_schema = js.get("schema")
+        ops.append({
+            "path": o.path, "method": o.method, "op": op,
+            "params": params, "body_schema": body_schema
+        })
 
     Tree = dict
     root: Tree = {}
@@ -204,26 +277,19 @@ def build_facade(openapi: Dict[str, Any]) -> str:
             node = node.setdefault(part, {})
         return node
 
-    for base, base_id in crud_bases:
-        segs = path_segments(base)
-        ns = segs[:-1]
-        resource = segs[-1]
-        list_op = paths[base]["get"]
-        resp_model = model_base_from_schema(((list_op.get("responses") or {}).get("200") or {}).get("content", {}).get("application/json", {}).get("schema"))
-        leaf = resource
-        if resp_model and resp_model.lower() != resource.lower():
-            leaf = snake(resp_model)
-        node = ensure(ns)
+    for c in index.crud_specs:
+        leaf = c.resource
+        if c.schema_base and c.schema_base.lower() != c.resource.lower():
+            leaf = snake(c.schema_base)
+        node = ensure(c.namespace)
         node[leaf] = {
             "kind": "crud",
-            "basePath": base.rstrip("/"),
-            "modelBase": resp_model or resource
+            "basePath": c.base.rstrip("/"),
+            "modelBase": c.schema_base or c.resource
         }
 
     for item in ops:
         p = item["path"]
-        if any(p == base or p.startswith(base) for base in crud_set):
-            continue
         segs = path_segments(p)
         if item["op"].get("summary"):
             func_name = snake(item["op"]["summary"])
@@ -243,31 +309,26 @@ def build_facade(openapi: Dict[str, Any]) -> str:
             "hasBody": item["body_schema"] is not None
         }
 
-    out: List[str] = []
+    def sort_tree(node: Tree) -> Tree:
+        # one sorted copy of the finished tree; dicts keep that order while emitting
+        return {
+            k: node[k] if node[k].get("kind") in ("crud", "endpoint") else sort_tree(node[k])
+            for k in sorted(node)
+        }
+
+    buf = io.StringIO()
+    write = buf.write
 
-    def emit_node(node: Dict[str, Any], depth: int, out: List[str]) -> None:
+    def emit_node(node: Dict[str, Any], depth: int) -> None:
         indent = "  " * depth
-        out.append(f"{indent}{{\n")
-        keys = sorted(node.keys())
-        for i, key in enumerate(keys):
-            val = node[key]
-            is_last = (i == len(keys) - 1)
-            prop_indent = "  " * (depth + 1)
+        prop_indent = indent + "  "
+        write(f"{indent}{{\n")
+        last = len(node) - 1
+        for i, (key, val) in enumerate(node.items()):
+            is_last = (i == last)
             if isinstance(val, dict) and val.get("kind") == "crud":
-                base = val["basePath"]
-                out.append(f"{prop_indent}{key}: {{\n")
-                out.append(
-                    f"{prop_indent}  list: (query?: {{ page?: number; page_size?: number }}) => client.GET('{base}/', {{ params: {{ query }} }}),\n")
-                out.append(
-                    f"{prop_indent}  get: (id: number) => client.GET('{base}/{{id}}', {{ params: {{ path: {{ id }} }} }}),\n")
-                out.append(
-                    f"{prop_indent}  create: (body: paths['{base}/']['post']['requestBody']['content']['application/json']) => client.POST('{base}/', {{ body }}),\n")
-                out.append(
-                    f"{prop_indent}  update: (id: number, body: paths['{base}/{{id}}']['put']['requestBody']['content']['application/json']) => client.PUT('{base}/{{id}}', {{ params: {{ path: {{ id }} }}, body }}),\n")
-                out.append(
-                    f"{prop_indent}  delete: (id: number) => client.DELETE('{base}/{{id}}', {{ params: {{ path: {{ id }} }} }}),\n")
-                out.append(f"{prop_indent}}}")
-                out.append(",\n" if not is_last else "\n")
+                write(_CRUD_TMPL.substitute(prop_indent=prop_indent, key=key, base=val["basePath"]))
+                write(",\n" if not is_last else "\n")
             elif isinstance(val, dict) and val.get("kind") == "endpoint":
                 method = val["method"]
                 path = val["path"]
@@ -294,33 +355,32 @@ def build_facade(openapi: Dict[str, Any]) -> str:
                         call_parts.append("params: { query }")
                 sig = ", ".join(sig_parts)
                 call_obj = ", ".join(call_parts)
-                out.append(f"{prop_indent}{key}: ({sig}) => client.{method}('{path}', {{ {call_obj} }})")
-                out.append(",\n" if not is_last else "\n")
+                write(_ENDPOINT_TMPL.substitute(
+                    prop_indent=prop_indent, key=key, sig=sig, method=method, path=path, call_obj=call_obj))
+                write(",\n" if not is_last else "\n")
             else:
-                out.append(f"{prop_indent}{key}: ")
-                emit_node(val, depth + 2, out)
-                out.append("," if not is_last else "")
-                out.append("\n")
-        out.append(f"{indent}}}")
-
-    out.append("// Auto-generated facade — DO NOT EDIT\n")
-    out.append("import type { paths } from './openapi';\n")
-    out.append("import { makeClient } from './client';\n\n")
-    out.append("export function makeAPI(baseUrl: string, init?: RequestInit) {\n")
-    out.append("  const client = makeClient(baseUrl, init);\n")
-    out.append("  const API = ")
-    emit_node(root, depth=2, out=out)
-    out.append(" as const;\n")
-    out.append("  return API;\n")
-    out.append("}\n")
-    return "".join(out)
+                write(f"{prop_indent}{key}: ")
+                emit_node(val, depth + 2)
+                write("," if not is_last else "")
+                write("\n")
+        write(f"{indent}}}")
+
+    write("// Auto-generated facade — DO NOT EDIT\n")
+    write("import type { paths } from './openapi';\n")
+    write("import { makeClient } from './client';\n\n")
+    write("export function makeAPI(baseUrl: string, init?: RequestInit) {\n")
+    write("  const client = makeClient(baseUrl, init);\n")
+    write("  const API = ")
+    emit_node(sort_tree(root), depth=2)
+    write(" as const;\n")
+    write("  return API;\n")
+    write("}\n")
+    return buf.getvalue()
 
 # ----------------- models.ts generation -----------------
 
-def build_models(openapi: Dict[str, Any]) -> str:
-    paths: Dict[str, Any] = openapi.get("paths", {})  # type: ignore
-    crud = find_crud_bases(paths)
-    crud_set = { base for base,_ in crud }
+def build_models(index: SpecIndex) -> str:
+    paths = index.paths
     out: List[str] = []
     out.append("// Auto-generated models — DO NOT EDIT\n")
     out.append("import type { paths } from './openapi';\n\n")
@@ -329,13 +389,8 @@ def build_models(openapi: Dict[str, Any]) -> str:
         out.append(f"export type {alias} = {rhs};\n")
 
     # CRUD model aliases
-    for base, base_id in crud:
-        # Try to infer a friendly model name from the list response; if not, fall back to last segment.
-        list_schema = (paths[base]["get"].get("responses") or {}).get("200", {})
-        resource_seg = path_segments(base)[-1]  # e.g., 'some_entity'
-        schema_base = model_base_from_schema(
-            ((list_schema.get("content") or {}).get("application/json") or {}).get("schema"))
-        Model = pick_model_base(schema_base, resource_seg)  # -> 'SomeEntity'
+    for c in index.crud_specs:
+        base, base_id, Model = c.base, c.base_id, c.model_base  # Model -> 'SomeEntity'
         ListAlias = f"{Model}ListResponse"
         GetAlias  = f"{Model}GetResponse"
         CreateReq = f"{Model}CreateRequest"
@@ -369,7 +424,7 @@ def build_models(openapi: Dict[str, Any]) -> str:
 
     # Custom endpoints (non-CRUD)
     for p, methods in paths.items():
-        if any(p == base or p.startswith(base) for base in crud_set):
+        if index.is_crud_path(p):
             continue
         segs = path_segments(p)
         literals = [s for s in segs if "{" not in s and "}" not in s]
@@ -425,7 +480,7 @@ def main():
     ap.add_argument("--out", required=True, help="Frontend output dir, e.g. ../frontend/src/wapp")
     ap.add_argument("--overwrite-client", action="store_true")
     ap.add_argument("--openapi-typescript", default="npx openapi-typescript")
-    ap.add_argument("--emit-openapi-ts", action="store_true", help="Emit openapi.ts instead of .ts (recommended)")
+    ap.add_argument("--emit-openapi-ts", action="store_true", help="Pipe the spec to openapi-typescript and emit openapi.ts only (no openapi.json)")
     args = ap.parse_args()
 
     out_dir = pathlib.Path(args.out).resolve()
@@ -454,20 +509,31 @@ def main():
         raise SystemExit("`--app` must be a FastAPI instance (e.g. 'main:app') or a zero-arg factory (e.g. 'main:create_app').")
 
     spec = app.openapi()
+    # paths, ops and CRUD bases are scanned once and shared by api.ts and models.ts
+    index = SpecIndex(spec)
+
+    spec_json = dump_json(spec)
 
-    # 1) openapi.json
+    # 1) openapi.json (skipped with --emit-openapi-ts: the spec is piped to openapi-typescript)
     openapi_json = out_dir / "openapi.json"
-    write_text(openapi_json, json.dumps(spec, ensure_ascii=False, indent=2))
-    print(f"✅ Wrote {openapi_json}")
+    if not args.emit_openapi_ts:
+        write_bytes(openapi_json, spec_json)
+        print(f"✅ Wrote {openapi_json}")
 
     # 2) openapi types
-    if args.emit_openapi_ts:
-        openapi_types = out_dir / "openapi.ts"
-    else:
-        openapi_types = out_dir / "openapi.ts"
-    cmd = f'{args.openapi_typescript} "{openapi_json}" -o "{openapi_types}"'
-    res = subprocess.run(cmd, shell=True)
-    if res.returncode != 0:
+    openapi_types = out_dir / "openapi.ts"
+    cmd = shlex.split(args.openapi_typescript, posix=os.name != "nt")
+    if not cmd:
+        raise SystemExit("openapi-typescript failed: --openapi-typescript is empty (e.g. 'npx openapi-typescript').")
+    cmd[0] = shutil.which(cmd[0]) or cmd[0]  # resolves npx.cmd on Windows without a shell
+    try:
+        if args.emit_openapi_ts:
+            res = subprocess.run([*cmd, "-o", str(openapi_types)], input=spec_json)
+        else:
+            res = subprocess.run([*cmd, str(openapi_json), "-o", str(openapi_types)])
+    except FileNotFoundError:
+        res = None
+    if res is None or res.returncode != 0:
         raise SystemExit("openapi-typescript failed. Is Node/npm available?")
     print(f"✅ Wrote {openapi_types}")
 
@@ -479,12 +545,12 @@ def main():
 
     # 4) api.ts
     api_ts = out_dir / "api.ts"
-    write_text(api_ts, build_facade(spec))
+    write_text(api_ts, build_facade(index))
     print(f"✅ Wrote {api_ts}")
 
     # 5) models.ts (request/response aliases + inferred Item types)
     models_ts = out_dir / "models.ts"
-    write_text(models_ts, build_models(spec))
+    write_text(models_ts, build_models(index))
     print(f"✅ Wrote {models_ts}")
 
     print("✅✅✅ Done.")